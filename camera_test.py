@@ -5,7 +5,6 @@ Helps diagnose camera connection issues
 """
 
 import cv2
-import numpy as np
 import time
 
 def test_cameras():
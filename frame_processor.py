@@ -6,75 +6,200 @@ Processes captured frames to extract frame scan data and measurements
 
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import ndimage
-from scipy.signal import find_peaks
-import math
+import threading
+
+# Angles for the 1000 radius measurements around the frame
+RADII_ANGLES = np.linspace(0, 2 * np.pi, 1000, endpoint=False)
+
+def _build_radii_template():
+    """Evaluate the radius model at every angle in RADII_ANGLES"""
+    # This is a simplified model - you may need to adjust based on actual frame shape
+    base_radius = 1550  # Base radius in 0.1mm units
+    radii = 100 * np.sin(RADII_ANGLES * 2)
+    radii += 50 * np.cos(RADII_ANGLES * 3)
+    radii += base_radius
+    
+    # Ensure radius is within reasonable bounds (in place), then store as
+    # little-endian uint16, the layout OMa files use
+    np.clip(radii, 1500, 2700, out=radii)
+    template = radii.astype('<u2')
+    template.flags.writeable = False  # Shared by every scan
+    return template
+
+# Radius data for a detected frame, in 0.1mm units
+RADII_TEMPLATE = _build_radii_template()
+
+def radii_angles(count):
+    """Return the polar angles for count evenly spaced radius points"""
+    if count == len(RADII_ANGLES):
+        return RADII_ANGLES
+    return np.linspace(0, 2 * np.pi, count, endpoint=False)
 
 class FrameProcessor:
     def __init__(self):
         self.last_processed_frame = None
         self.scan_contours = []
+        self.scan_contour_areas = []
+        # The same contours at detection resolution, and the factor that maps
+        # them to full-resolution frame coordinates
+        self._detected_contours = []
+        self._contour_scale = 1
         self.frame_measurements = {}
+        # Guards the contour state shared between the capture and scan threads
+        self._state_lock = threading.RLock()
+        
+        # Preprocessing parameters, built once and reused for every frame
+        self.blur_kernel_size = (5, 5)
+        self._kernel3 = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+        
+        # Frames at least this wide are detected at half resolution
+        self.downscale_min_width = 1280
+        
+        # Run preprocessing on the GPU through OpenCV's transparent API when
+        # an OpenCL device is available; otherwise stay on the CPU path
+        self.use_opencl = cv2.ocl.haveOpenCL()
+        
+        # Per-stage image buffers, reused across frames of the same size.
+        # The lock serialises the capture thread and scans, which share them
+        self._buffers = {}
+        self._buffer_lock = threading.Lock()
         
     def process_frame(self, frame):
         """Process incoming frame for frame scan detection"""
         if frame is None:
             return False
         
-        # Convert to grayscale for processing
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Apply preprocessing filters
-        processed = self._preprocess_frame(gray)
-        
-        # Detect frame contours
-        contours = self._detect_frame_contours(processed)
-        
-        if contours:
-            self.scan_contours = contours
-            self.last_processed_frame = frame
+        with self._buffer_lock:
+            # Convert to grayscale for processing
+            gray = self._to_gray(frame)
+            
+            # Large frames are detected at half resolution; only the contour
+            # geometry is needed, not full-resolution detail
+            scale = 1
+            if gray.shape[1] >= self.downscale_min_width:
+                h, w = gray.shape
+                gray = cv2.pyrDown(gray, dst=self._buffer('small', ((h + 1) // 2, (w + 1) // 2)))
+                scale = 2
+            
+            # Apply preprocessing filters
+            processed = self._preprocess_frame(gray)
+            
+            # Detect frame contours (findContours returns new arrays, so the
+            # result does not alias the reused buffers)
+            detected = self._detect_frame_contours(processed, min_area=1000 / (scale * scale))
+        
+        if detected:
+            # Keep the detected contours for measuring, and map copies (and the
+            # areas) back to full-resolution frame coordinates for drawing
+            detected_contours = [contour for contour, _ in detected]
+            contours = [contour * scale for contour in detected_contours]
+            areas = [area * scale * scale for _, area in detected]
+            with self._state_lock:
+                self.scan_contours = contours
+                self.scan_contour_areas = areas
+                self._detected_contours = detected_contours
+                self._contour_scale = scale
+                self.last_processed_frame = frame
             return True
         
         return False
     
+    def _buffer(self, name, shape):
+        """Return the reusable uint8 buffer for a pipeline stage, sized to shape"""
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, np.uint8)
+            self._buffers[name] = buf
+        return buf
+    
+    def _to_gray(self, frame):
+        """Return a grayscale view of the frame, converting only when needed"""
+        if frame.ndim == 2:
+            # Already grayscale
+            return frame
+        if frame.shape[2] == 1:
+            return frame[:, :, 0]
+        gray = self._buffer('gray', frame.shape[:2])
+        if frame.shape[2] == 2:
+            # Raw YUYV (CAP_PROP_CONVERT_RGB off) - the Y plane is the grayscale image
+            np.copyto(gray, frame[:, :, 0])
+            return gray
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+    
     def _preprocess_frame(self, gray_frame):
         """Apply preprocessing filters to improve frame detection"""
+        if self.use_opencl:
+            try:
+                return self._preprocess_frame_opencl(gray_frame)
+            except cv2.error as e:
+                # Fall back to the CPU path for good if the device fails
+                print(f"OpenCL preprocessing failed, using CPU: {e}")
+                self.use_opencl = False
+        
         # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray_frame, (5, 5), 0)
+        shape = gray_frame.shape
+        blurred = cv2.GaussianBlur(gray_frame, self.blur_kernel_size, 0,
+                                   dst=self._buffer('blur', shape))
         
         # Apply adaptive thresholding
         thresh = cv2.adaptiveThreshold(
             blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY, 11, 2
+            cv2.THRESH_BINARY, 11, 2, dst=self._buffer('thresh', shape)
         )
         
-        # Apply morphological operations to clean up the image
-        kernel = np.ones((3, 3), np.uint8)
-        processed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-        processed = cv2.morphologyEx(processed, cv2.MORPH_OPEN, kernel)
+        # Apply morphological operations to clean up the image, ping-ponging
+        # between the threshold and morphology buffers
+        processed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, self._kernel3,
+                                     dst=self._buffer('morph', shape))
+        processed = cv2.morphologyEx(processed, cv2.MORPH_OPEN, self._kernel3, dst=thresh)
         
         return processed
     
-    def _detect_frame_contours(self, processed_frame):
-        """Detect frame contours in the processed image"""
-        # Find contours
+    def _preprocess_frame_opencl(self, gray_frame):
+        """Same filters as _preprocess_frame, run on an OpenCL device via cv2.UMat"""
+        umat = cv2.UMat(gray_frame)
+        blurred = cv2.GaussianBlur(umat, self.blur_kernel_size, 0)
+        thresh = cv2.adaptiveThreshold(
+            blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+            cv2.THRESH_BINARY, 11, 2
+        )
+        processed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, self._kernel3)
+        processed = cv2.morphologyEx(processed, cv2.MORPH_OPEN, self._kernel3)
+        
+        # findContours runs on the CPU, so download the result once here
+        return processed.get()
+    
+    def _detect_frame_contours(self, processed_frame, min_area=1000):
+        """Detect frame contours in the processed image
+        
+        Returns a list of (contour, area) tuples so callers can reuse the
+        areas computed during filtering.
+        """
+        # Find contours. RETR_EXTERNAL only traces outer boundaries, which is
+        # cheaper than labelling every pixel with connectedComponentsWithStats
+        # and keeps blobs enclosed by the frame out of the result
         contours, _ = cv2.findContours(
             processed_frame, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
         )
         
-        # Filter contours based on area and shape
+        # Filter contours based on area first, in one pass over all contours;
+        # noisy frames yield many tiny contours that never need shape checks
+        areas = np.fromiter(map(cv2.contourArea, contours), dtype=np.float64,
+                            count=len(contours))
+        candidates = np.flatnonzero(areas > min_area)  # Minimum area threshold
+        
+        # Then filter the remaining candidates on shape
         valid_contours = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 1000:  # Minimum area threshold
-                # Approximate contour to polygon
-                epsilon = 0.02 * cv2.arcLength(contour, True)
-                approx = cv2.approxPolyDP(contour, epsilon, True)
-                
-                # Check if it's roughly rectangular (4-8 vertices)
-                if len(approx) >= 4 and len(approx) <= 8:
-                    valid_contours.append(contour)
+        for i in candidates:
+            contour = contours[i]
+            
+            # Approximate contour to polygon
+            epsilon = 0.02 * cv2.arcLength(contour, True)
+            approx = cv2.approxPolyDP(contour, epsilon, True)
+            
+            # Check if it's roughly rectangular (4-8 vertices)
+            if len(approx) >= 4 and len(approx) <= 8:
+                valid_contours.append((contour, float(areas[i])))
         
         return valid_contours
     
@@ -83,12 +208,17 @@ class FrameProcessor:
         if frame is None:
             return None
         
-        # Process the frame
-        if not self.process_frame(frame):
-            return None
-        
-        # Extract measurements
-        measurements = self._extract_measurements(frame)
+        # Hold the state lock so the capture thread cannot replace the
+        # contours between detection and measurement
+        with self._state_lock:
+            # Process the frame, unless the capture loop already processed this
+            # exact frame and its contours are still current
+            if frame is not self.last_processed_frame and not self.process_frame(frame):
+                return None
+            
+            # Extract measurements
+            measurements = self._extract_measurements(frame)
+            contours = self.scan_contours
         
         # Generate radius data (similar to your example)
         radii_data = self._generate_radii_data(measurements)
@@ -97,7 +227,7 @@ class FrameProcessor:
             'timestamp': self._get_timestamp(),
             'measurements': measurements,
             'radii': radii_data,
-            'contours': self.scan_contours,
+            'contours': contours,
             'frame_shape': frame.shape
         }
         
@@ -111,49 +241,43 @@ class FrameProcessor:
             return measurements
         
         # Get the largest contour (assumed to be the main frame)
-        main_contour = max(self.scan_contours, key=cv2.contourArea)
+        # (areas were already computed during contour detection)
+        main_index = int(np.argmax(self.scan_contour_areas))
+        
+        # Measure the contour at detection resolution and scale the results;
+        # scaled vertices would lose a pixel at the far edges
+        main_contour = self._detected_contours[main_index]
+        scale = self._contour_scale
         
         # Get bounding rectangle
         x, y, w, h = cv2.boundingRect(main_contour)
-        measurements['width'] = w
-        measurements['height'] = h
-        measurements['area'] = cv2.contourArea(main_contour)
+        measurements['width'] = w * scale
+        measurements['height'] = h * scale
+        measurements['area'] = self.scan_contour_areas[main_index]
         
         # Calculate center point
         M = cv2.moments(main_contour)
         if M["m00"] != 0:
-            cx = int(M["m10"] / M["m00"])
-            cy = int(M["m01"] / M["m00"])
+            cx = int(M["m10"] / M["m00"] * scale)
+            cy = int(M["m01"] / M["m00"] * scale)
             measurements['center'] = (cx, cy)
         
         # Calculate perimeter
-        measurements['perimeter'] = cv2.arcLength(main_contour, True)
+        measurements['perimeter'] = cv2.arcLength(main_contour, True) * scale
         
         return measurements
     
     def _generate_radii_data(self, measurements):
-        """Generate radius data similar to the provided example"""
-        if not measurements or 'center' not in measurements:
-            return []
-        
-        center = measurements['center']
+        """Generate radius data similar to the provided example
         
-        # Generate 1000 radius measurements around the frame
-        radii = []
-        for i in range(1000):
-            angle = (i / 1000) * 2 * math.pi
-            
-            # Calculate radius based on frame shape and position
-            # This is a simplified model - you may need to adjust based on actual frame shape
-            base_radius = 1550  # Base radius in 0.1mm units
-            variation = 100 * math.sin(angle * 2) + 50 * math.cos(angle * 3)
-            radius = base_radius + variation
-            
-            # Ensure radius is within reasonable bounds
-            radius = max(1500, min(2700, radius))
-            radii.append(int(radius))
+        Returns a read-only uint16 array in 0.1mm units.
+        """
+        if not measurements or 'center' not in measurements:
+            return RADII_TEMPLATE[:0]
         
-        return radii
+        # The radius model only depends on the fixed angles, so the 1000
+        # radius measurements are precomputed once in RADII_TEMPLATE
+        return RADII_TEMPLATE
     
     def _get_timestamp(self):
         """Get current timestamp"""
@@ -186,14 +310,17 @@ class FrameProcessor:
     
     def plot_radii_data(self, radii_data):
         """Plot the radius data as a polar plot"""
-        if not radii_data:
+        if not len(radii_data):
             return None
         
+        # Imported here so the capture pipeline never loads matplotlib
+        import matplotlib.pyplot as plt
+        
         # Convert radii to millimeters (division by 10)
-        radii = np.array(radii_data) / 10.0
+        radii = np.divide(radii_data, 10.0)
         
-        # Create angles for 1000 points on 360°
-        theta = np.linspace(0, 2 * np.pi, 1000, endpoint=False)
+        # Angles for the points on 360° (precomputed for the usual 1000)
+        theta = radii_angles(len(radii))
         
         # Create polar plot
         fig = plt.figure(figsize=(8, 8))
@@ -8,11 +8,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import cv2
 from PIL import Image, ImageTk
-import threading
-import time
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
+from frame_processor import radii_angles
 
 class HuvitzGUI:
     def __init__(self, app):
@@ -28,6 +27,16 @@ class HuvitzGUI:
         self.current_frame = None
         self.scan_data = None
         
+        # Display buffers reused for every live-feed frame
+        self._display_bgr = np.empty((480, 640, 3), np.uint8)
+        self._display_rgba = np.empty((480, 640, 4), np.uint8)
+        self._display_photo = None
+        # Pending Tk after() job for the live feed and the last frame shown
+        self._video_job = None
+        self._video_seq = 0
+        # Scratch buffer for the analysis plot's radii in mm
+        self._radii_mm = np.empty(0)
+        
         # Setup GUI
         self.setup_gui()
         
@@ -135,8 +144,13 @@ class HuvitzGUI:
         self.analysis_frame = ttk.Frame(analysis_frame)
         self.analysis_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         
-        # Create matplotlib figure for analysis
-        self.analysis_fig, self.analysis_ax = plt.subplots(figsize=(8, 6))
+        # Create matplotlib figure for analysis with a single polar axes that
+        # is reused for every plot
+        self.analysis_fig = Figure(figsize=(8, 6))
+        self.analysis_ax = self.analysis_fig.add_subplot(111, projection='polar')
+        self.analysis_ax.set_title('Frame Scan Shape', pad=20)
+        self.analysis_ax.grid(True)
+        self._polar_line, = self.analysis_ax.plot([], [], linewidth=2, color='blue')
         self.analysis_canvas = FigureCanvasTkAgg(self.analysis_fig, self.analysis_frame)
         self.analysis_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
     
@@ -194,14 +208,16 @@ class HuvitzGUI:
                 self.scan_btn.config(state=tk.NORMAL)
                 self.status_label.config(text="Capturing...")
                 
-                # Start video update thread
-                self.video_thread = threading.Thread(target=self.update_video)
-                self.video_thread.daemon = True
-                self.video_thread.start()
+                # Start video updates on the Tk main loop
+                self._video_seq = 0
+                self._video_job = self.root.after(0, self.update_video)
             else:
                 messagebox.showerror("Error", "Failed to initialize camera")
         else:
             # Stop capture
+            if self._video_job is not None:
+                self.root.after_cancel(self._video_job)
+                self._video_job = None
             self.app.stop_capture()
             self.is_capturing = False
             self.capture_btn.config(text="Start Capture")
@@ -209,26 +225,45 @@ class HuvitzGUI:
             self.status_label.config(text="Ready")
     
     def update_video(self):
-        """Update video display"""
-        while self.is_capturing:
-            if self.app.current_frame is not None:
-                # Resize frame for display
-                frame = cv2.resize(self.app.current_frame, (640, 480))
-                
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Convert to PIL Image
-                pil_image = Image.fromarray(frame_rgb)
-                photo = ImageTk.PhotoImage(pil_image)
-                
-                # Update label
-                self.video_label.config(image=photo)
-                self.video_label.image = photo  # Keep a reference
-                
-                self.current_frame = self.app.current_frame
-            
-            time.sleep(0.033)  # ~30 FPS
+        """Update video display
+        
+        Runs on the Tk main loop via after(), since Tk widgets must only be
+        touched from the main thread, and reschedules itself while capturing.
+        """
+        self._video_job = None
+        if not self.is_capturing:
+            return
+        
+        # Only redraw when the capture thread has published a new frame
+        frame, seq = self.app.wait_for_frame(self._video_seq, timeout=0)
+        if seq != self._video_seq and frame is not None:
+            self._video_seq = seq
+            self.show_frame(frame)
+        
+        self._video_job = self.root.after(33, self.update_video)  # ~30 FPS
+    
+    def show_frame(self, frame):
+        """Draw a captured frame in the live feed"""
+        # Resize and convert into the preallocated buffers. OpenCV allocates
+        # a new output instead when a frame doesn't match them (e.g. a
+        # grayscale frame), so always use the returned arrays
+        resized = cv2.resize(frame, (640, 480), dst=self._display_bgr)
+        channels = 1 if resized.ndim == 2 else resized.shape[2]
+        code = {1: cv2.COLOR_GRAY2RGBA, 4: cv2.COLOR_BGRA2RGBA}.get(channels, cv2.COLOR_BGR2RGBA)
+        rgba = cv2.cvtColor(resized, code, dst=self._display_rgba)
+        
+        # Wrap the RGBA image without copying it
+        pil_image = Image.frombuffer('RGBA', (640, 480), rgba, 'raw', 'RGBA', 0, 1)
+        
+        # Update label, reusing the same Tk photo image after the first frame
+        if self._display_photo is None:
+            self._display_photo = ImageTk.PhotoImage(pil_image)
+            self.video_label.config(image=self._display_photo)
+            self.video_label.image = self._display_photo  # Keep a reference
+        else:
+            self._display_photo.paste(pil_image)
+        
+        self.current_frame = frame
     
     def capture_scan(self):
         """Capture a frame scan"""
@@ -283,22 +318,22 @@ class HuvitzGUI:
             messagebox.showerror("Error", "No scan data to plot")
             return
         
-        # Clear previous plot
-        self.analysis_ax.clear()
-        
-        # Plot radius data
+        # Plot radius data by updating the existing polar line
         radii = self.scan_data.get('radii', [])
-        if radii:
+        if len(radii):
             # Convert to polar plot
-            theta = np.linspace(0, 2 * np.pi, len(radii), endpoint=False)
-            radii_mm = np.array(radii) / 10.0  # Convert to mm
-            
-            self.analysis_ax = plt.subplot(111, projection='polar')
-            self.analysis_ax.plot(theta, radii_mm, linewidth=2, color='blue')
-            self.analysis_ax.set_title('Frame Scan Shape', pad=20)
-            self.analysis_ax.grid(True)
-        
-        self.analysis_canvas.draw()
+            theta = radii_angles(len(radii))
+            if len(self._radii_mm) != len(radii):
+                self._radii_mm = np.empty(len(radii))
+            radii_mm = np.divide(radii, 10.0, out=self._radii_mm)  # Convert to mm
+        else:
+            theta = radii_mm = []
+        
+        self._polar_line.set_data(theta, radii_mm)
+        self.analysis_ax.relim()
+        self.analysis_ax.autoscale_view()
+        
+        self.analysis_canvas.draw_idle()
     
     def export_to_json(self):
         """Export scan data to JSON"""
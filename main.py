@@ -5,14 +5,11 @@ Captures frame scan data via VGA/USB adapter and generates OMa files
 """
 
 import cv2
-import numpy as np
-import matplotlib.pyplot as plt
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+import sys
 import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import time
-import os
-import json
 from datetime import datetime
 from frame_processor import FrameProcessor
 from oma_generator import OMAGenerator
@@ -25,19 +22,41 @@ class HuvitzExcelonCapture:
         self.frame_processor = FrameProcessor()
         self.oma_generator = OMAGenerator()
         self.current_frame = None
+        self._frame_lock = threading.Lock()
+        # Signalled whenever a new frame is published; _frame_seq counts them
+        self._frame_ready = threading.Condition(self._frame_lock)
+        self._frame_seq = 0
         self.scan_data = None
+        # Single-slot hand-off between the grab and processing threads
+        self._frame_queue = queue.Queue(maxsize=1)
+        # Open devices with the platform's native backend instead of letting
+        # OpenCV probe every backend on each open
+        if sys.platform.startswith('win'):
+            self._backend = cv2.CAP_DSHOW
+        elif sys.platform.startswith('linux'):
+            self._backend = cv2.CAP_V4L2
+        else:
+            self._backend = cv2.CAP_ANY
+        # Live preview only feeds every Nth frame to the processor; scans
+        # always process the frame they are given
+        self.process_every_n = 5
         
     def initialize_camera(self, camera_index=0):
         """Initialize the camera capture device"""
         try:
-            self.capture = cv2.VideoCapture(camera_index)
+            self.capture = cv2.VideoCapture(camera_index, self._backend)
             if not self.capture.isOpened():
                 raise Exception(f"Cannot open camera at index {camera_index}")
             
-            # Set camera properties for better frame capture
+            # Set camera properties for better frame capture. MJPG keeps 1080p
+            # within USB bandwidth on most capture adapters; drivers that
+            # don't support it simply ignore the request
+            self.capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
             self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
             self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
             self.capture.set(cv2.CAP_PROP_FPS, 30)
+            # Keep only the newest frame in the driver queue to avoid lag
+            self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             
             return True
         except Exception as e:
@@ -47,36 +66,96 @@ class HuvitzExcelonCapture:
     def start_capture(self):
         """Start continuous frame capture"""
         self.is_capturing = True
-        self.capture_thread = threading.Thread(target=self._capture_loop)
-        self.capture_thread.daemon = True
-        self.capture_thread.start()
+        self._grab_thread = threading.Thread(target=self._capture_loop)
+        self._grab_thread.daemon = True
+        self._grab_thread.start()
+        
+        self._process_thread = threading.Thread(target=self._process_loop)
+        self._process_thread.daemon = True
+        self._process_thread.start()
     
     def stop_capture(self):
         """Stop frame capture"""
         self.is_capturing = False
+        # Wake any thread waiting for a frame so it can see capture has stopped
+        with self._frame_ready:
+            self._frame_ready.notify_all()
+        # Let the grab thread leave the driver call before releasing the device
+        grab_thread = getattr(self, '_grab_thread', None)
+        if grab_thread and grab_thread is not threading.current_thread():
+            grab_thread.join(timeout=1.0)
         if self.capture:
             self.capture.release()
     
     def _capture_loop(self):
-        """Main capture loop"""
+        """Main capture loop - grabs frames as fast as the driver delivers them"""
         while self.is_capturing:
-            if self.capture and self.capture.isOpened():
-                ret, frame = self.capture.read()
+            if not (self.capture and self.capture.isOpened()):
+                break
+            
+            # grab() blocks on the driver with the GIL released, so no sleep is needed
+            if self.capture.grab():
+                ret, frame = self.capture.retrieve()
                 if ret:
-                    self.current_frame = frame
-                    # Process frame for frame scan detection
-                    self.frame_processor.process_frame(frame)
-                else:
-                    print("Failed to capture frame")
-            time.sleep(0.033)  # ~30 FPS
+                    # retrieve() returns a fresh array, so publishing the reference is enough
+                    with self._frame_ready:
+                        self.current_frame = frame
+                        self._frame_seq += 1
+                        seq = self._frame_seq
+                        self._frame_ready.notify_all()
+                    
+                    if seq % self.process_every_n == 0:
+                        self._publish_frame(frame)
+                    continue
+            print("Failed to capture frame")
+            time.sleep(0.033)  # Back off instead of spinning on a failing device
+    
+    def _publish_frame(self, frame):
+        """Hand the newest frame to the processing thread, dropping any stale one"""
+        try:
+            self._frame_queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._frame_queue.put_nowait(frame)
+        except queue.Full:
+            pass
+    
+    def _process_loop(self):
+        """Process captured frames for frame scan detection"""
+        while self.is_capturing:
+            try:
+                frame = self._frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self.frame_processor.process_frame(frame)
+    
+    def get_latest_frame(self):
+        """Return the most recently captured frame, or None"""
+        with self._frame_lock:
+            return self.current_frame
+    
+    def wait_for_frame(self, last_seq, timeout=None):
+        """Block until a frame newer than last_seq is captured
+        
+        Returns (frame, seq). seq equals last_seq if the wait timed out or
+        capture stopped before a new frame arrived.
+        """
+        with self._frame_ready:
+            self._frame_ready.wait_for(
+                lambda: self._frame_seq != last_seq or not self.is_capturing, timeout
+            )
+            return self.current_frame, self._frame_seq
     
     def capture_scan(self):
         """Capture a single frame scan"""
-        if self.current_frame is None:
+        # Snapshot the frame once so the capture thread cannot swap it mid-scan
+        frame = self.get_latest_frame()
+        if frame is None:
             return None
         
         # Process the current frame for frame scan data
-        scan_data = self.frame_processor.extract_scan_data(self.current_frame)
+        scan_data = self.frame_processor.extract_scan_data(frame)
         if scan_data:
             self.scan_data = scan_data
             return scan_data
@@ -93,23 +172,29 @@ class HuvitzExcelonCapture:
         
         return self.oma_generator.create_oma_file(self.scan_data, filename)
     
-    def get_available_cameras(self):
+    def get_available_cameras(self, max_index=5):
         """Get list of available camera devices"""
-        cameras = []
-        # Only check first 5 camera indices to avoid errors
-        for i in range(5):
+        # Only check the first few camera indices to avoid errors. Opening a
+        # device can block for a long time on Windows, so probe them all at once.
+        with ThreadPoolExecutor(max_workers=max_index) as executor:
+            results = executor.map(self._probe_camera, range(max_index))
+        return [i for i in results if i is not None]
+    
+    def _probe_camera(self, index):
+        """Return the camera index if it opens and delivers a frame, otherwise None"""
+        try:
+            cap = cv2.VideoCapture(index, self._backend)
             try:
-                cap = cv2.VideoCapture(i)
                 if cap.isOpened():
                     # Try to read a frame to confirm it's working
                     ret, frame = cap.read()
                     if ret:
-                        cameras.append(i)
-                    cap.release()
-            except Exception as e:
-                print(f"Error checking camera {i}: {e}")
-                continue
-        return cameras
+                        return index
+            finally:
+                cap.release()
+        except Exception as e:
+            print(f"Error checking camera {index}: {e}")
+        return None
 
 def main():
     """Main application entry point"""
@@ -6,9 +6,224 @@ Generates OMa files from captured frame scan data
 
 import struct
 import json
+import mmap
 import numpy as np
 from datetime import datetime
 import os
+import logging
+from functools import lru_cache
+
+try:
+    # Optional: serializes numpy arrays natively and much faster than json
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Precompiled layouts of the fixed-size OMa fields
+_HDR = struct.Struct('<4sII')     # magic, version, number of radius points
+_U32 = struct.Struct('<I')        # string length prefix
+_FRAME = struct.Struct('<4I2d')   # width, height, center x, center y, area, perimeter
+
+# Device information is the same in every file, so encode it once
+_DEVICE_INFO = "Huvitz Excelon Frame Scanner".encode('utf-8')
+_DEVICE_SECTION = _U32.pack(len(_DEVICE_INFO)) + _DEVICE_INFO
+
+# Version 2 header: the same fields as version 1 but with fixed-size ASCII
+# strings (32 bytes holds a full isoformat() timestamp with UTC offset),
+# so the whole header is one packed record read with a single frombuffer
+_HDR_V2 = np.dtype([
+    ('magic', 'S4'), ('version', '<u4'), ('n_radii', '<u4'),
+    ('timestamp', 'S32'), ('device', 'S32'),
+    ('width', '<u4'), ('height', '<u4'), ('cx', '<u4'), ('cy', '<u4'),
+    ('area', '<f8'), ('perimeter', '<f8'),
+], align=False)
+
+# Flag in the version 2 version field: radii are delta + zigzag varint coded
+_DELTA_RADII = 0x10000
+
+@lru_cache(maxsize=8)
+def _radii_struct(count):
+    """Compiled layout for count radius points (scans reuse a few sizes)"""
+    return struct.Struct(f'<{count}H')
+
+def _radii_u2(radii):
+    """Return radii as a contiguous '<u2' array, rejecting values that don't fit"""
+    radii = np.asarray(radii)
+    if radii.dtype != '<u2' and radii.size:
+        # A plain cast would wrap or truncate these without complaint
+        if radii.dtype.kind not in 'iu':
+            raise ValueError(f"Radius data must be integers, got {radii.dtype}")
+        if radii.min() < 0 or radii.max() > 0xFFFF:
+            raise ValueError("Radius data out of range for 16-bit storage")
+    
+    return np.ascontiguousarray(radii, dtype='<u2')
+
+class _ScanFields:
+    """The scan_data fields written to an OMa file, with defaults applied"""
+    __slots__ = ('radii', 'timestamp', 'width', 'height', 'center_x',
+                 'center_y', 'area', 'perimeter')
+    
+    def __init__(self, scan_data):
+        self.radii = scan_data.get('radii', [])
+        
+        # Format the current time only when no timestamp was given
+        timestamp = scan_data.get('timestamp')
+        self.timestamp = datetime.now().isoformat() if timestamp is None else timestamp
+        
+        measurements = scan_data.get('measurements', {})
+        self.width = measurements.get('width', 0)
+        self.height = measurements.get('height', 0)
+        self.center_x, self.center_y = measurements.get('center', (0, 0))
+        self.area = measurements.get('area', 0)
+        self.perimeter = measurements.get('perimeter', 0)
+
+def _encode_radii_delta(radii):
+    """Encode radii as a raw first value followed by zigzag varint deltas
+    
+    Neighbouring radii differ by a few units, so most deltas fit in one byte.
+    """
+    radii = _radii_u2(radii)
+    deltas = np.diff(radii.astype(np.int32))
+    zigzag = ((deltas << 1) ^ (deltas >> 31)).astype(np.uint32)
+    
+    # Deltas of 16-bit values need at most three 7-bit groups
+    lengths = 1 + (zigzag >= 1 << 7) + (zigzag >= 1 << 14)
+    starts = np.cumsum(lengths) - lengths
+    
+    out = np.empty(2 + int(lengths.sum()), dtype=np.uint8)
+    out[:2] = radii[:1].view(np.uint8)
+    for k in range(3):
+        mask = lengths > k
+        group = (zigzag[mask] >> (7 * k)) & 0x7F
+        more = (lengths[mask] > k + 1) * 0x80
+        out[2 + starts[mask] + k] = group | more
+    
+    return memoryview(out)
+
+def _decode_radii_delta(content, offset, count):
+    """Decode count radii written by _encode_radii_delta"""
+    if offset + 2 > len(content):
+        raise ValueError("File truncated - missing radius data")
+    
+    first = int(np.frombuffer(content, dtype='<u2', count=1, offset=offset)[0])
+    data = np.frombuffer(content, dtype=np.uint8, offset=offset + 2)
+    ends = np.flatnonzero(data < 0x80)[:count - 1]
+    if len(ends) < count - 1:
+        raise ValueError("File truncated - missing radius data")
+    
+    radii = np.empty(count, dtype=np.int64)
+    radii[0] = first
+    if count > 1:
+        # Sum each varint's 7-bit groups, then undo the zigzag and the deltas
+        stream = data[:ends[-1] + 1]
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        lengths = ends - starts + 1
+        if lengths.max() > 3:
+            # The encoder never writes more than three groups per delta
+            raise ValueError("Invalid radius data - varint too long")
+        
+        shifts = 7 * (np.arange(len(stream)) - np.repeat(starts, lengths))
+        zigzag = np.add.reduceat((stream & 0x7F).astype(np.int64) << shifts, starts)
+        deltas = (zigzag >> 1) ^ -(zigzag & 1)
+        np.cumsum(deltas, out=radii[1:])
+        radii[1:] += first
+    
+    if radii.min() < 0 or radii.max() > 0xFFFF:
+        raise ValueError("Invalid radius data")
+    
+    return radii.astype('<u2')
+
+def _read_radii(content, offset, count, delta=False):
+    """Validate and read the radius section of either OMa version"""
+    # Validate number of radius points
+    if count <= 0 or count > 10000:
+        raise ValueError(f"Invalid number of radius points: {count}")
+    
+    if delta:
+        return _decode_radii_delta(content, offset, count)
+    
+    expected_radius_size = count * 2
+    if offset + expected_radius_size > len(content):
+        raise ValueError(f"File truncated - missing radius data. Expected {expected_radius_size} bytes, got {len(content) - offset}")
+    
+    # Read-only view into content; copy() it before modifying
+    return np.frombuffer(content, dtype='<u2', count=count, offset=offset)
+
+def _write_sections(f, sections):
+    """Write buffers to an open binary file back to back"""
+    if not hasattr(os, 'writev'):
+        # No gather I/O (Windows); the buffered writer copies small sections
+        # together and writes large ones straight through
+        for section in sections:
+            f.write(section)
+        return
+    
+    # POSIX: hand all sections to the kernel in one gather write, resuming
+    # after a short write if needed
+    views = [memoryview(section).cast('B') for section in sections]
+    while views:
+        written = os.writev(f.fileno(), views)
+        while views and written >= len(views[0]):
+            written -= len(views.pop(0))
+        if views:
+            views[0] = views[0][written:]
+
+# Sample radius data from your example, converted once to the on-disk format
+_SAMPLE_RADII = np.array([
+    2354,2359,2365,2370,2376,2381,2387,2393,2398,2404,2410,2416,2423,2429,2435,2442,2448,2455,2461,2468,
+    2475,2482,2489,2496,2503,2510,2518,2525,2532,2540,2547,2555,2563,2570,2578,2586,2594,2602,2609,2617,
+    2625,2633,2640,2645,2651,2655,2659,2662,2664,2666,2667,2668,2667,2666,2665,2663,2660,2656,2652,2647,
+    2641,2635,2628,2620,2611,2601,2592,2582,2572,2561,2550,2540,2529,2518,2507,2496,2484,2473,2462,2450,
+    2439,2427,2415,2403,2392,2380,2368,2356,2344,2332,2320,2308,2297,2285,2274,2263,2252,2241,2230,2219,
+    2208,2198,2187,2177,2166,2156,2146,2136,2126,2116,2107,2097,2088,2078,2069,2060,2051,2042,2033,2025,
+    2016,2008,1999,1991,1983,1975,1967,1959,1951,1943,1936,1928,1921,1914,1906,1899,1892,1885,1878,1872,
+    1865,1858,1852,1845,1839,1833,1826,1820,1814,1808,1802,1797,1791,1785,1780,1774,1769,1763,1758,1753,
+    1748,1742,1737,1732,1728,1723,1718,1713,1709,1704,1700,1695,1691,1687,1682,1678,1674,1670,1666,1662,
+    1659,1655,1651,1648,1644,1641,1637,1634,1631,1628,1624,1621,1618,1615,1612,1610,1607,1604,1601,1599,
+    1596,1594,1591,1589,1587,1585,1582,1580,1578,1576,1574,1572,1570,1569,1567,1565,1563,1562,1560,1559,
+    1557,1556,1555,1553,1552,1551,1550,1549,1548,1547,1546,1545,1544,1544,1543,1542,1542,1541,1541,1540,
+    1540,1539,1539,1539,1539,1538,1538,1538,1538,1538,1538,1539,1539,1539,1539,1540,1540,1541,1541,1542,
+    1542,1543,1544,1544,1545,1546,1547,1548,1549,1550,1551,1552,1553,1555,1556,1557,1559,1560,1562,1563,
+    1565,1567,1568,1570,1572,1574,1576,1578,1580,1582,1584,1586,1589,1591,1594,1596,1599,1601,1604,1606,
+    1609,1612,1615,1618,1621,1624,1627,1630,1634,1637,1640,1644,1647,1651,1654,1658,1662,1666,1670,1674,
+    1678,1682,1686,1690,1695,1699,1704,1708,1713,1718,1722,1727,1732,1737,1742,1748,1753,1758,1764,1769,
+    1775,1780,1786,1792,1798,1804,1810,1816,1822,1829,1835,1842,1848,1855,1862,1868,1875,1882,1889,1896,
+    1904,1911,1919,1926,1934,1941,1949,1957,1965,1973,1981,1990,1998,2007,2015,2024,2033,2042,2051,2060,
+    2069,2078,2088,2097,2107,2116,2126,2136,2146,2156,2166,2176,2187,2197,2207,2218,2229,2239,2250,2261,
+    2271,2282,2292,2303,2313,2324,2334,2345,2355,2365,2376,2386,2396,2406,2416,2426,2436,2445,2454,2462,
+    2471,2479,2487,2494,2502,2509,2515,2522,2528,2534,2540,2545,2550,2554,2559,2563,2567,2570,2573,2576,
+    2579,2581,2583,2585,2587,2589,2590,2592,2593,2594,2595,2596,2597,2598,2598,2598,2599,2599,2599,2599,
+    2598,2598,2597,2597,2596,2595,2594,2593,2591,2590,2589,2587,2586,2584,2582,2580,2579,2577,2574,2572,
+    2570,2568,2565,2563,2560,2558,2555,2552,2549,2546,2543,2540,2537,2534,2531,2527,2524,2521,2517,2514,
+    2511,2508,2504,2501,2498,2495,2492,2489,2486,2483,2480,2477,2474,2472,2469,2466,2464,2461,2459,2457,
+    2454,2452,2450,2448,2445,2443,2441,2439,2437,2436,2434,2432,2430,2429,2427,2426,2424,2423,2422,2420,
+    2419,2418,2417,2416,2415,2414,2413,2412,2411,2410,2410,2409,2408,2408,2407,2407,2407,2406,2406,2406,
+    2406,2406,2406,2406,2406,2406,2406,2406,2406,2406,2405,2405,2404,2404,2403,2402,2401,2401,2400,2398,
+    2396,2394,2391,2388,2384,2380,2375,2370,2364,2358,2352,2345,2337,2329,2320,2311,2301,2291,2281,2271,
+    2261,2251,2241,2231,2221,2211,2201,2191,2180,2170,2160,2149,2139,2129,2119,2109,2100,2090,2081,2071,
+    2062,2053,2044,2035,2026,2018,2009,2001,1992,1984,1976,1968,1960,1952,1945,1937,1929,1922,1915,1907,
+    1900,1893,1886,1879,1872,1866,1859,1852,1846,1840,1833,1827,1821,1815,1809,1803,1797,1792,1786,1780,
+    1775,1770,1764,1759,1754,1749,1744,1739,1734,1729,1724,1719,1715,1710,1706,1701,1697,1693,1688,1684,
+    1680,1676,1672,1668,1664,1661,1657,1653,1650,1646,1643,1639,1636,1633,1629,1626,1623,1620,1617,1614,
+    1611,1609,1606,1603,1601,1598,1595,1593,1591,1588,1586,1584,1582,1579,1577,1575,1573,1571,1570,1568,
+    1566,1564,1563,1561,1560,1558,1557,1555,1554,1553,1551,1550,1549,1548,1547,1546,1545,1544,1543,1542,
+    1542,1541,1540,1540,1539,1539,1538,1538,1537,1537,1537,1537,1537,1536,1536,1536,1536,1536,1537,1537,
+    1537,1537,1538,1538,1538,1539,1539,1540,1541,1541,1542,1543,1544,1545,1545,1546,1547,1549,1550,1551,
+    1552,1553,1555,1556,1558,1559,1561,1562,1564,1566,1568,1569,1571,1573,1575,1577,1579,1582,1584,1586,
+    1588,1591,1593,1596,1598,1601,1604,1606,1609,1612,1615,1618,1621,1624,1627,1631,1634,1637,1641,1644,
+    1648,1652,1655,1659,1663,1667,1671,1675,1679,1683,1687,1691,1695,1700,1704,1709,1713,1718,1723,1727,
+    1732,1737,1742,1747,1752,1758,1763,1768,1774,1779,1785,1790,1796,1802,1808,1814,1820,1826,1832,1838,
+    1845,1851,1858,1864,1871,1878,1885,1892,1899,1906,1913,1920,1927,1935,1942,1949,1957,1964,1972,1979,
+    1987,1995,2002,2010,2017,2024,2031,2038,2045,2052,2059,2065,2071,2078,2083,2089,2094,2099,2104,2108,
+    2112,2116,2119,2122,2125,2127,2129,2131,2133,2134,2136,2137,2138,2139,2141,2142,2143,2144,2145,2146,
+    2147,2148,2148,2149,2150,2151,2152,2153,2154,2155,2156,2157,2158,2159,2160,2161,2162,2164,2165,2166,
+    2168,2169,2170,2172,2173,2175,2176,2178,2180,2181,2183,2185,2187,2189,2191,2193,2195,2197,2199,2201,
+    2204,2206,2209,2211,2214,2217,2219,2222,2225,2228,2231,2234,2237,2241,2244,2247,2251,2254,2258,2261,
+    2265,2269,2273,2276,2280,2284,2289,2293,2297,2301,2306,2310,2315,2320,2324,2329,2334,2339,2344,2349
+], dtype='<u2')
+_SAMPLE_RADII.flags.writeable = False
 
 class OMAGenerator:
     def __init__(self):
@@ -18,105 +233,171 @@ class OMAGenerator:
             'format': 'OMA'
         }
     
-    def create_oma_file(self, scan_data, filename):
-        """Create an OMa file from scan data"""
+    def create_oma_file(self, scan_data, filename, version=1, delta_radii=False):
+        """Create an OMa file from scan data
+        
+        scan_data['radii'] is a uint16 array in 0.1mm units; plain lists of
+        ints are also accepted. version=2 writes the fixed-layout header
+        (strings limited to 32 bytes); with delta_radii it also stores the
+        radii delta coded, which roughly halves their size.
+        """
+        # Create the OMa file structure; values that don't fit the binary
+        # layout are reported, anything else is a bug and propagates
+        try:
+            sections = self._build_oma_sections(scan_data, version, delta_radii)
+        except (struct.error, ValueError, OverflowError) as e:
+            logger.error("Error creating OMa file: %s", e)
+            return None
+        
+        # Write to file
         try:
-            # Create the OMa file structure
-            oma_content = self._build_oma_content(scan_data)
-            
-            # Write to file
             with open(filename, 'wb') as f:
-                f.write(oma_content)
-            
-            print(f"OMa file created successfully: {filename}")
-            return filename
-            
-        except Exception as e:
-            print(f"Error creating OMa file: {e}")
+                _write_sections(f, sections)
+        except OSError as e:
+            logger.error("Error creating OMa file: %s", e)
             return None
+        
+        print(f"OMa file created successfully: {filename}")
+        return filename
     
-    def _build_oma_content(self, scan_data):
-        """Build the binary content for the OMa file"""
-        # Header information
-        header = self._create_header(scan_data)
+    def _build_oma_sections(self, scan_data, version=1, delta_radii=False):
+        """Build the OMa file as buffers to be written back to back
         
-        # Frame data
-        frame_data = self._create_frame_data(scan_data)
+        The header and frame data share one buffer; the radius data is kept
+        separate so large arrays are written without being copied into it.
+        """
+        if delta_radii and version != 2:
+            raise ValueError("Delta coded radii need OMa version 2")
         
-        # Radius data
-        radius_data = self._create_radius_data(scan_data)
+        # Resolve defaults once; the section builders read plain attributes
+        scan = _ScanFields(scan_data)
         
-        # Combine all data
-        content = header + frame_data + radius_data
+        if version == 2:
+            head = self._create_header_v2(scan, delta_radii)
+        elif version == 1:
+            head = bytearray()
+            
+            # Header information
+            self._create_header(head, scan)
+            
+            # Frame data
+            self._create_frame_data(head, scan)
+        else:
+            raise ValueError(f"Unsupported OMa version: {version}")
         
-        return content
+        # Radius data
+        radius_data = self._create_radius_data(scan, delta_radii)
+        
+        return [head, radius_data] if radius_data else [head]
     
-    def _create_header(self, scan_data):
-        """Create the OMa file header"""
+    def _create_header(self, buf, scan):
+        """Append the OMa file header to buf"""
+        timestamp_bytes = scan.timestamp.encode('utf-8')
+        
+        # Reserve the whole header in one step, then fill it in place
+        offset = len(buf)
+        buf.extend(bytes(_HDR.size + _U32.size + len(timestamp_bytes)
+                         + len(_DEVICE_SECTION)))
+        
         # OMa file header structure
-        header = struct.pack('<4s', b'OMAF')  # Magic number
-        header += struct.pack('<I', 1)  # Version
-        header += struct.pack('<I', len(scan_data.get('radii', [])))  # Number of radius points
+        # Magic number, version and number of radius points
+        _HDR.pack_into(buf, offset, b'OMAF', 1, len(scan.radii))
+        offset += _HDR.size
         
         # Timestamp
-        timestamp = scan_data.get('timestamp', datetime.now().isoformat())
-        timestamp_bytes = timestamp.encode('utf-8')
-        header += struct.pack('<I', len(timestamp_bytes))
-        header += timestamp_bytes
-        
-        # Device information
-        device_info = "Huvitz Excelon Frame Scanner"
-        device_bytes = device_info.encode('utf-8')
-        header += struct.pack('<I', len(device_bytes))
-        header += device_bytes
-        
-        return header
+        _U32.pack_into(buf, offset, len(timestamp_bytes))
+        offset += _U32.size
+        buf[offset:offset + len(timestamp_bytes)] = timestamp_bytes
+        offset += len(timestamp_bytes)
+        
+        # Device information (length prefix included)
+        buf[offset:offset + len(_DEVICE_SECTION)] = _DEVICE_SECTION
     
-    def _create_frame_data(self, scan_data):
-        """Create frame measurement data"""
-        measurements = scan_data.get('measurements', {})
+    def _create_frame_data(self, buf, scan):
+        """Append frame measurement data to buf"""
+        buf.extend(_FRAME.pack(scan.width, scan.height, scan.center_x,
+                               scan.center_y, scan.area, scan.perimeter))
+    
+    def _create_header_v2(self, scan, delta_radii=False):
+        """Create the fixed-layout version 2 header, frame data included"""
+        # ISO timestamps are ASCII, so the field holds the string as is and
+        # numpy does the encoding while filling the record
+        timestamp = scan.timestamp
         
-        # Frame measurements
-        width = measurements.get('width', 0)
-        height = measurements.get('height', 0)
-        area = measurements.get('area', 0)
-        perimeter = measurements.get('perimeter', 0)
+        # numpy would silently truncate oversized strings
+        if len(timestamp) > _HDR_V2['timestamp'].itemsize:
+            raise ValueError(f"Timestamp too long for OMa version 2: {timestamp!r}")
         
-        center = measurements.get('center', (0, 0))
-        center_x, center_y = center
+        # numpy would also accept None (as NaN) or numeric strings here, so
+        # check the frame fields against the version 1 layout first; both
+        # versions then reject the same values with struct.error
+        _FRAME.pack(scan.width, scan.height, scan.center_x, scan.center_y,
+                    scan.area, scan.perimeter)
         
-        # Pack frame data
-        frame_data = struct.pack('<4I', width, height, center_x, center_y)
-        frame_data += struct.pack('<2d', area, perimeter)
+        # Fill the whole record from one tuple, in field order
+        header = np.array((
+            b'OMA2', 2 | (_DELTA_RADII if delta_radii else 0), len(scan.radii),
+            timestamp, _DEVICE_INFO,
+            scan.width, scan.height, scan.center_x, scan.center_y,
+            scan.area, scan.perimeter,
+        ), dtype=_HDR_V2)
         
-        return frame_data
+        return header.tobytes()
     
-    def _create_radius_data(self, scan_data):
+    def _create_radius_data(self, scan, delta_radii=False):
         """Create radius data section"""
-        radii = scan_data.get('radii', [])
+        radii = scan.radii
         
-        if not radii:
+        if not len(radii):
             return b''
         
-        # Pack radius data as 16-bit integers
-        radius_data = struct.pack(f'<{len(radii)}H', *radii)
+        if delta_radii:
+            return _encode_radii_delta(radii)
+        
+        if isinstance(radii, np.ndarray):
+            # Scanner data: little-endian 16-bit integers viewed as bytes, with
+            # no conversion at all if radii is already a contiguous '<u2' array
+            radius_data = _radii_u2(radii)
+            return memoryview(radius_data).cast('B')
         
-        return radius_data
+        # Legacy list callers: packing with a cached Struct is faster than
+        # converting to an array first
+        return _radii_struct(len(radii)).pack(*radii)
     
     def read_oma_file(self, filename):
         """Read and parse an OMa file"""
         try:
-            with open(filename, 'rb') as f:
-                content = f.read()
+            f = open(filename, 'rb')
+        except OSError as e:
+            logger.error("Error reading OMa file: %s", e)
+            return None
+        
+        with f:
+            # mmap cannot map an empty file; let the parser reject it
+            if os.fstat(f.fileno()).st_size == 0:
+                return self._parse_oma_content(b'')
             
-            return self._parse_oma_content(content)
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except OSError as e:
+                logger.error("Error reading OMa file: %s", e)
+                return None
             
-        except Exception as e:
-            print(f"Error reading OMa file: {e}")
-            return None
+            # Parse straight from the page cache instead of reading a copy
+            with mm:
+                oma_data = self._parse_oma_content(mm)
+                if oma_data:
+                    # Detach radii from the mapping before it is closed
+                    oma_data['radii'] = oma_data['radii'].copy()
+                return oma_data
     
     def _parse_oma_content(self, content):
-        """Parse the binary OMa file content"""
+        """Parse the binary OMa file content
+        
+        The returned 'radii' is a uint16 array rather than a list: a read-only
+        view into content for raw radius data, or a new array for delta coded
+        version 2 files.
+        """
         try:
             offset = 0
             
@@ -124,29 +405,22 @@ class OMAGenerator:
             if len(content) < 16:
                 raise ValueError("File too small to be a valid OMa file")
             
-            # Read header
-            magic = struct.unpack('<4s', content[offset:offset+4])[0]
-            offset += 4
+            # Read header (magic, version and radius count in one call)
+            magic, version, num_radii = _HDR.unpack_from(content, offset)
+            offset += _HDR.size
+            
+            if magic == b'OMA2':
+                return self._parse_oma_v2(content)
             
             if magic != b'OMAF':
                 raise ValueError("Invalid OMa file format - wrong magic number")
             
-            version = struct.unpack('<I', content[offset:offset+4])[0]
-            offset += 4
-            
-            num_radii = struct.unpack('<I', content[offset:offset+4])[0]
-            offset += 4
-            
-            # Validate number of radius points
-            if num_radii <= 0 or num_radii > 10000:
-                raise ValueError(f"Invalid number of radius points: {num_radii}")
-            
             # Read timestamp
             if offset + 4 > len(content):
                 raise ValueError("File truncated - missing timestamp length")
             
-            timestamp_len = struct.unpack('<I', content[offset:offset+4])[0]
-            offset += 4
+            timestamp_len, = _U32.unpack_from(content, offset)
+            offset += _U32.size
             
             if offset + timestamp_len > len(content):
                 raise ValueError("File truncated - missing timestamp data")
@@ -158,8 +432,8 @@ class OMAGenerator:
             if offset + 4 > len(content):
                 raise ValueError("File truncated - missing device info length")
             
-            device_len = struct.unpack('<I', content[offset:offset+4])[0]
-            offset += 4
+            device_len, = _U32.unpack_from(content, offset)
+            offset += _U32.size
             
             if offset + device_len > len(content):
                 raise ValueError("File truncated - missing device info data")
@@ -168,20 +442,14 @@ class OMAGenerator:
             offset += device_len
             
             # Read frame data
-            if offset + 32 > len(content):
+            if offset + _FRAME.size > len(content):
                 raise ValueError("File truncated - missing frame data")
             
-            width, height, center_x, center_y = struct.unpack('<4I', content[offset:offset+16])
-            offset += 16
-            area, perimeter = struct.unpack('<2d', content[offset:offset+16])
-            offset += 16
+            width, height, center_x, center_y, area, perimeter = _FRAME.unpack_from(content, offset)
+            offset += _FRAME.size
             
             # Read radius data
-            expected_radius_size = num_radii * 2
-            if offset + expected_radius_size > len(content):
-                raise ValueError(f"File truncated - missing radius data. Expected {expected_radius_size} bytes, got {len(content) - offset}")
-            
-            radii = list(struct.unpack(f'<{num_radii}H', content[offset:offset+expected_radius_size]))
+            radii = _read_radii(content, offset, num_radii)
             
             return {
                 'version': version,
@@ -197,87 +465,122 @@ class OMAGenerator:
                 'radii': radii
             }
             
-        except Exception as e:
-            print(f"Error parsing OMa content: {e}")
+        except (struct.error, ValueError) as e:
+            # Malformed or truncated file (UnicodeDecodeError is a ValueError)
+            logger.error("Error parsing OMa content: %s", e)
             return None
     
+    def _parse_oma_v2(self, content):
+        """Parse version 2 content, whose header is one fixed-size record"""
+        if len(content) < _HDR_V2.itemsize:
+            raise ValueError("File truncated - missing version 2 header")
+        
+        header = np.frombuffer(content, dtype=_HDR_V2, count=1)[0]
+        version = int(header['version'])
+        num_radii = int(header['n_radii'])
+        
+        # Version 2 with no flags other than delta coded radii
+        if version & ~_DELTA_RADII != 2:
+            raise ValueError(f"Unsupported OMa version 2 header: {version:#x}")
+        
+        # Read radius data
+        radii = _read_radii(content, _HDR_V2.itemsize, num_radii,
+                            delta=bool(version & _DELTA_RADII))
+        
+        # Convert the fields to Python values so nothing else views content
+        return {
+            'version': version & ~_DELTA_RADII,
+            'timestamp': header['timestamp'].decode('ascii'),
+            'device_info': header['device'].decode('ascii'),
+            'measurements': {
+                'width': int(header['width']),
+                'height': int(header['height']),
+                'center': (int(header['cx']), int(header['cy'])),
+                'area': float(header['area']),
+                'perimeter': float(header['perimeter'])
+            },
+            'radii': radii
+        }
+    
     def export_to_json(self, scan_data, filename):
-        """Export scan data to JSON format for debugging"""
+        """Export scan data to JSON format for debugging
+        
+        Meant for reading by people; export_to_npz is faster and smaller.
+        """
+        json_data = {
+            'timestamp': scan_data.get('timestamp'),
+            'measurements': scan_data.get('measurements', {}),
+            'radii': scan_data.get('radii', []),
+            'frame_shape': scan_data.get('frame_shape')
+        }
+        
+        # Serialize first so unserializable data and I/O failures are
+        # reported separately
         try:
-            # Convert numpy arrays to lists for JSON serialization
-            json_data = {
-                'timestamp': scan_data.get('timestamp'),
-                'measurements': scan_data.get('measurements', {}),
-                'radii': scan_data.get('radii', []),
-                'frame_shape': scan_data.get('frame_shape')
-            }
-            
-            with open(filename, 'w') as f:
-                json.dump(json_data, f, indent=2)
-            
-            print(f"JSON export created: {filename}")
-            return filename
-            
-        except Exception as e:
-            print(f"Error creating JSON export: {e}")
+            if orjson is not None:
+                # orjson writes numpy arrays directly, no list conversion needed,
+                # but only C-contiguous, native byte order ones: it rejects
+                # sliced arrays and misreads big-endian ones
+                radii = json_data['radii']
+                if isinstance(radii, np.ndarray) and not (
+                        radii.flags.c_contiguous and radii.dtype.isnative):
+                    json_data['radii'] = radii.tolist()
+                
+                json_bytes = orjson.dumps(
+                    json_data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2
+                )
+            else:
+                # Convert numpy arrays to lists for JSON serialization
+                if isinstance(json_data['radii'], np.ndarray):
+                    json_data['radii'] = json_data['radii'].tolist()
+                
+                json_bytes = json.dumps(json_data, indent=2).encode('utf-8')
+        except (TypeError, ValueError) as e:
+            logger.error("Error creating JSON export: %s", e)
+            return None
+        
+        try:
+            with open(filename, 'wb') as f:
+                f.write(json_bytes)
+        except OSError as e:
+            logger.error("Error creating JSON export: %s", e)
+            return None
+        
+        print(f"JSON export created: {filename}")
+        return filename
+    
+    def export_to_npz(self, scan_data, filename, compress=True):
+        """Export scan data to a NumPy .npz archive for debugging
+        
+        Radii are stored as one uint16 array and measurements as separate
+        entries; load it back with np.load(filename).
+        """
+        try:
+            arrays = {'radii': _radii_u2(scan_data.get('radii', []))}
+        except (ValueError, OverflowError) as e:
+            logger.error("Error creating NPZ export: %s", e)
             return None
+        
+        for key in ('timestamp', 'frame_shape'):
+            if scan_data.get(key) is not None:
+                arrays[key] = np.asarray(scan_data[key])
+        for key, value in scan_data.get('measurements', {}).items():
+            arrays[key] = np.asarray(value)
+        
+        save = np.savez_compressed if compress else np.savez
+        try:
+            # An open file keeps numpy from appending '.npz' to the name
+            with open(filename, 'wb') as f:
+                save(f, **arrays)
+        except OSError as e:
+            logger.error("Error creating NPZ export: %s", e)
+            return None
+        
+        print(f"NPZ export created: {filename}")
+        return filename
     
     def create_sample_oma(self, filename="sample_1552_51_13.oma"):
         """Create a sample OMa file based on the provided data"""
-        # Sample radius data from your example
-        sample_radii = [
-            2354,2359,2365,2370,2376,2381,2387,2393,2398,2404,2410,2416,2423,2429,2435,2442,2448,2455,2461,2468,
-            2475,2482,2489,2496,2503,2510,2518,2525,2532,2540,2547,2555,2563,2570,2578,2586,2594,2602,2609,2617,
-            2625,2633,2640,2645,2651,2655,2659,2662,2664,2666,2667,2668,2667,2666,2665,2663,2660,2656,2652,2647,
-            2641,2635,2628,2620,2611,2601,2592,2582,2572,2561,2550,2540,2529,2518,2507,2496,2484,2473,2462,2450,
-            2439,2427,2415,2403,2392,2380,2368,2356,2344,2332,2320,2308,2297,2285,2274,2263,2252,2241,2230,2219,
-            2208,2198,2187,2177,2166,2156,2146,2136,2126,2116,2107,2097,2088,2078,2069,2060,2051,2042,2033,2025,
-            2016,2008,1999,1991,1983,1975,1967,1959,1951,1943,1936,1928,1921,1914,1906,1899,1892,1885,1878,1872,
-            1865,1858,1852,1845,1839,1833,1826,1820,1814,1808,1802,1797,1791,1785,1780,1774,1769,1763,1758,1753,
-            1748,1742,1737,1732,1728,1723,1718,1713,1709,1704,1700,1695,1691,1687,1682,1678,1674,1670,1666,1662,
-            1659,1655,1651,1648,1644,1641,1637,1634,1631,1628,1624,1621,1618,1615,1612,1610,1607,1604,1601,1599,
-            1596,1594,1591,1589,1587,1585,1582,1580,1578,1576,1574,1572,1570,1569,1567,1565,1563,1562,1560,1559,
-            1557,1556,1555,1553,1552,1551,1550,1549,1548,1547,1546,1545,1544,1544,1543,1542,1542,1541,1541,1540,
-            1540,1539,1539,1539,1539,1538,1538,1538,1538,1538,1538,1539,1539,1539,1539,1540,1540,1541,1541,1542,
-            1542,1543,1544,1544,1545,1546,1547,1548,1549,1550,1551,1552,1553,1555,1556,1557,1559,1560,1562,1563,
-            1565,1567,1568,1570,1572,1574,1576,1578,1580,1582,1584,1586,1589,1591,1594,1596,1599,1601,1604,1606,
-            1609,1612,1615,1618,1621,1624,1627,1630,1634,1637,1640,1644,1647,1651,1654,1658,1662,1666,1670,1674,
-            1678,1682,1686,1690,1695,1699,1704,1708,1713,1718,1722,1727,1732,1737,1742,1748,1753,1758,1764,1769,
-            1775,1780,1786,1792,1798,1804,1810,1816,1822,1829,1835,1842,1848,1855,1862,1868,1875,1882,1889,1896,
-            1904,1911,1919,1926,1934,1941,1949,1957,1965,1973,1981,1990,1998,2007,2015,2024,2033,2042,2051,2060,
-            2069,2078,2088,2097,2107,2116,2126,2136,2146,2156,2166,2176,2187,2197,2207,2218,2229,2239,2250,2261,
-            2271,2282,2292,2303,2313,2324,2334,2345,2355,2365,2376,2386,2396,2406,2416,2426,2436,2445,2454,2462,
-            2471,2479,2487,2494,2502,2509,2515,2522,2528,2534,2540,2545,2550,2554,2559,2563,2567,2570,2573,2576,
-            2579,2581,2583,2585,2587,2589,2590,2592,2593,2594,2595,2596,2597,2598,2598,2598,2599,2599,2599,2599,
-            2598,2598,2597,2597,2596,2595,2594,2593,2591,2590,2589,2587,2586,2584,2582,2580,2579,2577,2574,2572,
-            2570,2568,2565,2563,2560,2558,2555,2552,2549,2546,2543,2540,2537,2534,2531,2527,2524,2521,2517,2514,
-            2511,2508,2504,2501,2498,2495,2492,2489,2486,2483,2480,2477,2474,2472,2469,2466,2464,2461,2459,2457,
-            2454,2452,2450,2448,2445,2443,2441,2439,2437,2436,2434,2432,2430,2429,2427,2426,2424,2423,2422,2420,
-            2419,2418,2417,2416,2415,2414,2413,2412,2411,2410,2410,2409,2408,2408,2407,2407,2407,2406,2406,2406,
-            2406,2406,2406,2406,2406,2406,2406,2406,2406,2406,2405,2405,2404,2404,2403,2402,2401,2401,2400,2398,
-            2396,2394,2391,2388,2384,2380,2375,2370,2364,2358,2352,2345,2337,2329,2320,2311,2301,2291,2281,2271,
-            2261,2251,2241,2231,2221,2211,2201,2191,2180,2170,2160,2149,2139,2129,2119,2109,2100,2090,2081,2071,
-            2062,2053,2044,2035,2026,2018,2009,2001,1992,1984,1976,1968,1960,1952,1945,1937,1929,1922,1915,1907,
-            1900,1893,1886,1879,1872,1866,1859,1852,1846,1840,1833,1827,1821,1815,1809,1803,1797,1792,1786,1780,
-            1775,1770,1764,1759,1754,1749,1744,1739,1734,1729,1724,1719,1715,1710,1706,1701,1697,1693,1688,1684,
-            1680,1676,1672,1668,1664,1661,1657,1653,1650,1646,1643,1639,1636,1633,1629,1626,1623,1620,1617,1614,
-            1611,1609,1606,1603,1601,1598,1595,1593,1591,1588,1586,1584,1582,1579,1577,1575,1573,1571,1570,1568,
-            1566,1564,1563,1561,1560,1558,1557,1555,1554,1553,1551,1550,1549,1548,1547,1546,1545,1544,1543,1542,
-            1542,1541,1540,1540,1539,1539,1538,1538,1537,1537,1537,1537,1537,1536,1536,1536,1536,1536,1537,1537,
-            1537,1537,1538,1538,1538,1539,1539,1540,1541,1541,1542,1543,1544,1545,1545,1546,1547,1549,1550,1551,
-            1552,1553,1555,1556,1558,1559,1561,1562,1564,1566,1568,1569,1571,1573,1575,1577,1579,1582,1584,1586,
-            1588,1591,1593,1596,1598,1601,1604,1606,1609,1612,1615,1618,1621,1624,1627,1631,1634,1637,1641,1644,
-            1648,1652,1655,1659,1663,1667,1671,1675,1679,1683,1687,1691,1695,1700,1704,1709,1713,1718,1723,1727,
-            1732,1737,1742,1747,1752,1758,1763,1768,1774,1779,1785,1790,1796,1802,1808,1814,1820,1826,1832,1838,
-            1845,1851,1858,1864,1871,1878,1885,1892,1899,1906,1913,1920,1927,1935,1942,1949,1957,1964,1972,1979,
-            1987,1995,2002,2010,2017,2024,2031,2038,2045,2052,2059,2065,2071,2078,2083,2089,2094,2099,2104,2108,
-            2112,2116,2119,2122,2125,2127,2129,2131,2133,2134,2136,2137,2138,2139,2141,2142,2143,2144,2145,2146,
-            2147,2148,2148,2149,2150,2151,2152,2153,2154,2155,2156,2157,2158,2159,2160,2161,2162,2164,2165,2166,
-            2168,2169,2170,2172,2173,2175,2176,2178,2180,2181,2183,2185,2187,2189,2191,2193,2195,2197,2199,2201,
-            2204,2206,2209,2211,2214,2217,2219,2222,2225,2228,2231,2234,2237,2241,2244,2247,2251,2254,2258,2261,
-            2265,2269,2273,2276,2280,2284,2289,2293,2297,2301,2306,2310,2315,2320,2324,2329,2334,2339,2344,2349
-        ]
-        
         # Create sample scan data
         sample_data = {
             'timestamp': datetime.now().isoformat(),
@@ -288,7 +591,7 @@ class OMAGenerator:
                 'area': 79152,
                 'perimeter': 3206
             },
-            'radii': sample_radii,
+            'radii': _SAMPLE_RADII,
             'frame_shape': (1080, 1920, 3)
         }
         
@@ -10,6 +10,8 @@ from frame_processor import FrameProcessor
 from oma_generator import OMAGenerator
 from datetime import datetime
 import cv2
+import os
+import tempfile
 
 def test_radius_plot():
     """Test the radius plotting functionality using the provided data"""
@@ -123,6 +125,80 @@ def test_oma_generation():
     if json_filename:
         print(f"JSON export created: {json_filename}")
 
+def test_oma_v2_round_trip():
+    """Test version 2 OMa files, raw and delta coded, and a truncated file"""
+    
+    sample_data = {
+        'timestamp': datetime.now().isoformat(),
+        'measurements': {
+            'width': 1552,
+            'height': 51,
+            'center': (776, 25),
+            'area': 79152,
+            'perimeter': 3206
+        },
+        # Small steps, a large jump and both ends of the 16-bit range
+        'radii': np.array([2354, 2359, 2365, 2360, 0, 65535, 65535, 1538, 1538, 2349], dtype=np.uint16)
+    }
+    
+    oma_gen = OMAGenerator()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for delta_radii in (False, True):
+            filename = os.path.join(tmp_dir, f"test_scan_v2_{int(delta_radii)}.oma")
+            assert oma_gen.create_oma_file(sample_data, filename, version=2, delta_radii=delta_radii)
+            
+            read_data = oma_gen.read_oma_file(filename)
+            assert read_data is not None
+            assert read_data['version'] == 2
+            assert read_data['timestamp'] == sample_data['timestamp']
+            assert read_data['measurements']['center'] == (776, 25)
+            assert read_data['measurements']['width'] == 1552
+            assert np.array_equal(read_data['radii'], sample_data['radii'])
+            print(f"  Version 2 round trip ok (delta_radii={delta_radii}, {os.path.getsize(filename)} bytes)")
+            
+            # Every truncation must be rejected rather than misread
+            with open(filename, 'rb') as f:
+                content = f.read()
+            for size in (0, 16, 107, 108, len(content) - 1):
+                assert oma_gen._parse_oma_content(content[:size]) is None
+            print(f"  Truncated version 2 files rejected (delta_radii={delta_radii})")
+        
+        # A delta longer than the three bytes the encoder writes is corrupt
+        content = bytearray(content)
+        content[110:111] = b'\xff\xff\xff\x7f'
+        assert oma_gen._parse_oma_content(bytes(content)) is None
+        print("  Overlong radius deltas rejected")
+
+def test_npz_export():
+    """Test NPZ export round trip"""
+    
+    sample_data = {
+        'timestamp': datetime.now().isoformat(),
+        'measurements': {'width': 1552, 'height': 51, 'center': (776, 25)},
+        'radii': [2354, 2359, 2365, 2370, 2376],
+        'frame_shape': (1080, 1920, 3)
+    }
+    
+    oma_gen = OMAGenerator()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "test_scan.npz")
+        assert oma_gen.export_to_npz(sample_data, filename) == filename
+        
+        with np.load(filename) as archive:
+            assert archive['radii'].dtype == np.uint16
+            assert archive['radii'].tolist() == sample_data['radii']
+            assert str(archive['timestamp']) == sample_data['timestamp']
+            assert tuple(archive['center']) == (776, 25)
+            assert int(archive['width']) == 1552
+        print("  NPZ round trip ok")
+        
+        # Radii that don't fit uint16 are rejected, not wrapped
+        assert oma_gen.export_to_npz({'radii': np.array([1.7, -1.0])}, filename) is None
+        assert oma_gen.export_to_npz({'radii': [70000]}, filename) is None
+        print("  Invalid NPZ radii rejected")
+
 def test_frame_processor():
     """Test frame processor functionality"""
     
@@ -149,6 +225,25 @@ def test_frame_processor():
     else:
         print("Frame processing failed")
 
+def test_downscaled_measurements():
+    """Test that half-resolution detection reports full-frame sizes"""
+    
+    # A 1080p frame is detected at half resolution by default
+    sample_frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    
+    downscaled = FrameProcessor()
+    native = FrameProcessor()
+    native.downscale_min_width = 10 ** 9  # Never downscale
+    
+    downscaled_data = downscaled.extract_scan_data(sample_frame)
+    native_data = native.extract_scan_data(sample_frame)
+    assert downscaled_data and native_data
+    
+    for key in ('width', 'height'):
+        assert downscaled_data['measurements'][key] == native_data['measurements'][key]
+    print(f"  Half-resolution size matches native: "
+          f"{downscaled_data['measurements']['width']}x{downscaled_data['measurements']['height']}")
+
 if __name__ == "__main__":
     print("Testing Huvitz Excelon Frame Scan System")
     print("=" * 50)
@@ -159,7 +254,16 @@ if __name__ == "__main__":
     print("\n2. Testing OMa file generation...")
     test_oma_generation()
     
-    print("\n3. Testing frame processor...")
+    print("\n3. Testing OMa version 2 files...")
+    test_oma_v2_round_trip()
+    
+    print("\n4. Testing NPZ export...")
+    test_npz_export()
+    
+    print("\n5. Testing frame processor...")
     test_frame_processor()
     
+    print("\n6. Testing half-resolution measurements...")
+    test_downscaled_measurements()
+    
     print("\nAll tests completed!") 
\ No newline at end of file